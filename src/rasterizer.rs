@@ -4,7 +4,7 @@ use std::io::{stdout, Write};
 use std::fs::File;
 use std::io::Read;
 
-use cpython::{PyResult, PyObject};
+use cpython::{PyResult, PyObject, PyBytes};
 
 use image::{
     RgbaImage,
@@ -55,6 +55,26 @@ py_class!(pub class PyImage |py| {
         Ok(img.height())
     }
 
+    def copy(&self) -> PyResult<PyImage> {
+        let img = self.img(py).borrow();
+
+        PyImage::create_instance(py, RefCell::new(img.clone()))
+    }
+
+    def to_bytes(&self) -> PyResult<PyBytes> {
+        let img = self.img(py).borrow();
+
+        Ok(PyBytes::new(py, &img))
+    }
+
+    @staticmethod
+    def from_bytes(width: u32, height: u32, data: PyBytes) -> PyResult<PyImage> {
+        let data = data.data(py).to_vec();
+        let img = RgbaImage::from_raw(width, height, data).expect("Invalid image data");
+
+        PyImage::create_instance(py, RefCell::new(img))
+    }
+
     @staticmethod
     def load(filename: String) -> PyResult<PyImage> {
         let img = image::open(&filename).expect(&format!("File not found {:?}", filename));
@@ -552,6 +552,33 @@ class LexerTest(TestCase):
 		self.assertToken(lexer.next(), TokenType.Integer, "5")
 		self.assertToken(lexer.next(), TokenType.EndOfStream)
 
+	def test_tokenize(self):
+		symbols = "((+-*/))"
+		buffer = Lexer(symbols).tokenize()
+
+		self.assertEqual(len(buffer), len(symbols) + 1)
+
+		for i, c in enumerate(symbols):
+			with self.subTest(i=i):
+				self.assertToken(buffer.token(i), TokenType.Symbol, c, ((1, i + 1), (1, i + 2)))
+
+		self.assertToken(buffer.token(len(symbols)), TokenType.EndOfStream, "", ((1, len(symbols) + 1), (1, len(symbols) + 1)))
+
+	def test_tokenize_iter(self):
+		string = "a b a b"
+
+		buffer = Lexer(string).tokenize()
+		tokens = list(Lexer(string))
+
+		self.assertEqual(len(buffer), len(tokens))
+
+		for i, (actual, expected) in enumerate(zip(buffer, tokens)):
+			with self.subTest(i=i):
+				self.assertToken(actual, expected)
+
+		# Repeated values are interned once
+		self.assertEqual(sorted(buffer.values), ["", "a", "b"])
+
 	def test_iter(self):
 		symbols = "((+-*/))"
 		lexer = Lexer(symbols)
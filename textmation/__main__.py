@@ -22,7 +22,7 @@ _ffmpeg_formats = ".mp4", ".avi", ".webm"
 _formats = ".gif", *_ffmpeg_formats
 
 
-def run(input_filename, output_filename, *, save_frames=False, print_ast=False, print_scene=False):
+def run(input_filename, output_filename, *, save_frames=False, workers=None, print_ast=False, print_scene=False):
 	begin = time.time()
 
 	output_dir = abspath(dirname(output_filename))
@@ -69,7 +69,7 @@ def run(input_filename, output_filename, *, save_frames=False, print_ast=False,
 	print(f"Rendering {calc_frame_count(scene.p_duration.seconds, scene.p_frame_rate, inclusive=scene.p_inclusive)} frames...", flush=True)
 
 	inclusive = bool(scene.p_inclusive)
-	frames = render_animation(scene, inclusive=inclusive)
+	frames = render_animation(scene, inclusive=inclusive, workers=workers)
 
 	if save_frames:
 		print("Exporting Frames...", flush=True)
@@ -102,9 +102,9 @@ def run(input_filename, output_filename, *, save_frames=False, print_ast=False,
 	print(f"Rendered in {pretty_duration(ceil(duration))}")
 
 
-def try_run(input_filename, output_filename, *, save_frames=False, verbose=False, print_ast=False, print_scene=False):
+def try_run(input_filename, output_filename, *, save_frames=False, workers=None, verbose=False, print_ast=False, print_scene=False):
 	try:
-		run(input_filename, output_filename, save_frames=save_frames, print_ast=print_ast, print_scene=print_scene)
+		run(input_filename, output_filename, save_frames=save_frames, workers=workers, print_ast=print_ast, print_scene=print_scene)
 		return 0
 	except Exception as ex:
 		sys.stdout.flush()
@@ -125,13 +125,14 @@ def main():
 	args_parser.add_argument("-o", "--output", default="output.gif", help="Output filename")
 	args_parser.add_argument("filename", help="Textmation file to process")
 	args_parser.add_argument("--save-frames", action="store_const", const=True, default=False)
+	args_parser.add_argument("--workers", type=int, default=None, help="Number of processes to render frames with")
 	args_parser.add_argument("--print-ast", action="store_const", const=True, default=False)
 	args_parser.add_argument("--print-scene", action="store_const", const=True, default=False)
 	args_parser.add_argument("--verbose", action="store_const", const=True, default=False)
 
 	args = args_parser.parse_args()
 
-	return try_run(args.filename, args.output, save_frames=args.save_frames, verbose=args.verbose, print_ast=args.print_ast, print_scene=args.print_scene)
+	return try_run(args.filename, args.output, save_frames=args.save_frames, workers=args.workers, verbose=args.verbose, print_ast=args.print_ast, print_scene=args.print_scene)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,63 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from operator import add, sub, mul, truediv, floordiv, mod, and_, or_, neg
+
 from .base import *
 
 
+_binary_operators = {
+	"+": add,
+	"-": sub,
+	"*": mul,
+	"/": truediv,
+	"//": floordiv,
+	"%": mod,
+	"&": and_,
+	"|": or_,
+}
+
+
 class Expression(Value):
+	def _collect_dependencies(self):
+		# Every reachable value carrying a version counter (element
+		# properties), including through other properties' values and
+		# through percentages' relative properties
+		dependencies = []
+		seen = set()
+		stack = [self]
+
+		while stack:
+			value = stack.pop()
+
+			if id(value) in seen:
+				continue
+			seen.add(id(value))
+
+			if hasattr(value, "version"):
+				dependencies.append(value)
+
+			stack.extend(value.iter_values())
+
+			relative = getattr(value, "relative", None)
+			if relative is not None:
+				stack.append(relative)
+
+		return tuple(dependencies)
+
 	def eval(self):
+		versions = tuple(property.version for property in self._dependencies)
+
+		if versions != self._versions:
+			# A changed dependency may reference new properties,
+			# so recollect before re-evaluating
+			self._dependencies = self._collect_dependencies()
+			self._versions = tuple(property.version for property in self._dependencies)
+			self._cache = self._eval()
+
+		return self._cache
+
+	def _eval(self):
 		raise NotImplementedError
 
 	def fold(self):
@@ -20,50 +72,20 @@ class Expression(Value):
 
 class BinOp(Expression):
 	def __init__(self, op, lhs, rhs):
-		assert op in ("+", "-", "*", "/", "//", "%", "&", "|")
+		assert op in _binary_operators
 		assert isinstance(lhs, Value)
 		assert isinstance(rhs, Value)
 		self.op, self.lhs, self.rhs = op, lhs, rhs
+		self._func = _binary_operators[op]
+		self._dependencies, self._versions, self._cache = (), None, None
 		self.type # Triggers type checking
 
 	@property
 	def type(self):
-		if self.op == "+":
-			return self.lhs.type + self.rhs.type
-		if self.op == "-":
-			return self.lhs.type - self.rhs.type
-		if self.op == "*":
-			return self.lhs.type * self.rhs.type
-		if self.op == "/":
-			return self.lhs.type / self.rhs.type
-		if self.op == "//":
-			return self.lhs.type // self.rhs.type
-		if self.op == "%":
-			return self.lhs.type % self.rhs.type
-		if self.op == "&":
-			return self.lhs.type & self.rhs.type
-		if self.op == "|":
-			return self.lhs.type | self.rhs.type
-		raise NotImplementedError
+		return self._func(self.lhs.type, self.rhs.type)
 
-	def eval(self):
-		if self.op == "+":
-			return self.lhs.eval() + self.rhs.eval()
-		if self.op == "-":
-			return self.lhs.eval() - self.rhs.eval()
-		if self.op == "*":
-			return self.lhs.eval() * self.rhs.eval()
-		if self.op == "/":
-			return self.lhs.eval() / self.rhs.eval()
-		if self.op == "//":
-			return self.lhs.eval() // self.rhs.eval()
-		if self.op == "%":
-			return self.lhs.eval() % self.rhs.eval()
-		if self.op == "&":
-			return self.lhs.eval() & self.rhs.eval()
-		if self.op == "|":
-			return self.lhs.eval() | self.rhs.eval()
-		raise NotImplementedError
+	def _eval(self):
+		return self._func(self.lhs.eval(), self.rhs.eval())
 
 	def fold(self):
 		if self.is_constant():
@@ -90,14 +112,16 @@ class UnaryOp(Expression):
 		assert op == "-"
 		assert isinstance(operand, Value)
 		self.op, self.operand = op, operand
+		self._func = neg
+		self._dependencies, self._versions, self._cache = (), None, None
 		self.type # Triggers type checking
 
 	@property
 	def type(self):
-		return -self.operand.type
+		return self._func(self.operand.type)
 
-	def eval(self):
-		return -self.operand.eval()
+	def _eval(self):
+		return self._func(self.operand.eval())
 
 	def fold(self):
 		if self.is_constant():
@@ -121,13 +145,14 @@ class Call(Expression):
 	def __init__(self, func, args=()):
 		self.func = func
 		self.args = tuple(args)
+		self._dependencies, self._versions, self._cache = (), None, None
 		self.func.type_check(self.args)
 
 	@property
 	def type(self):
 		return self.func.return_type
 
-	def eval(self):
+	def _eval(self):
 		return self.func(*(arg.eval() for arg in self.args))
 
 	def fold(self):
@@ -90,6 +90,7 @@ class ElementProperty(Value):
 		self.readonly = False
 		self.constant = constant
 		self.keyframes = []
+		self.version = 0
 
 		self.set(value)
 
@@ -113,6 +114,7 @@ class ElementProperty(Value):
 
 		self.value = value
 		self.value.apply(self.relative)
+		self.version += 1
 
 		paths = find_cycles(self)
 		if paths:
@@ -269,11 +271,14 @@ class Element(Value):
 			yield from child.traverse()
 
 	def compute(self, time):
+		self.compute_properties(time)
+		self.compute_children(time)
+
+	def compute_properties(self, time):
 		for name, property in self.properties.items():
 			if property.readonly:
 				continue
 			self.set_computed(name, property.eval())
-		self.compute_children(time)
 
 	def compute_children(self, time):
 		for child in self.children:
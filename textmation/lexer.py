@@ -1,17 +1,61 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from itertools import zip_longest
 from contextlib import suppress
+from array import array
 import string
+import re
 from enum import IntEnum
 from ast import literal_eval
 
 
-_horizontal_whitespace = " \t"
+_horizontal_whitespace = frozenset(" \t")
 
-_identifier_start = string.ascii_letters + "_$"
-_identifier = _identifier_start + string.digits
+_identifier_start = frozenset(string.ascii_letters + "_$")
+_identifier = _identifier_start | frozenset(string.digits)
+
+# None of these patterns can match a newline, so scanning
+# a whole run at once leaves the line bookkeeping trivial
+_identifier_pattern = re.compile("[%s]*" % re.escape("".join(_identifier)))
+_digits_pattern = re.compile(r"\d*")
+_horizontal_whitespace_pattern = re.compile("[%s]*" % re.escape("".join(_horizontal_whitespace)))
+_comment_pattern = re.compile(r"[^\r\n]*")
+
+# A whole string literal in one match; escapes cannot hide a newline,
+# so a failed match means the literal is unterminated on its line
+_string_patterns = {
+	"\"": re.compile(r'"(?:\\.|[^"\\\n])*"'),
+	"'": re.compile(r"'(?:\\.|[^'\\\n])*'"),
+}
+
+_CLS_OTHER                 = 0
+_CLS_COMMENT               = 1
+_CLS_DIGIT                 = 2
+_CLS_IDENTIFIER            = 3
+_CLS_QUOTE                 = 4
+_CLS_NEWLINE               = 5
+_CLS_HORIZONTAL_WHITESPACE = 6
+
+
+def _classify(c):
+	if c == "#":
+		return _CLS_COMMENT
+	if c.isdigit():
+		return _CLS_DIGIT
+	if c in _identifier_start:
+		return _CLS_IDENTIFIER
+	if c in "\"'":
+		return _CLS_QUOTE
+	if c in "\r\n":
+		return _CLS_NEWLINE
+	if c in _horizontal_whitespace:
+		return _CLS_HORIZONTAL_WHITESPACE
+	return _CLS_OTHER
+
+
+# Classification of the first 256 code points, indexed by ord(c);
+# everything non-ASCII classifies as _CLS_OTHER
+_class_table = bytes(map(_classify, map(chr, range(128)))) + bytes(128)
 
 
 class TokenType(IntEnum):
@@ -27,7 +71,23 @@ class TokenType(IntEnum):
 	Symbol      = 9
 
 
+# Plain int token types for hot-path comparisons; IntEnum.__eq__ is a
+# Python-level call, a raw int compare is not. TokenType stays for
+# pretty-printing and the public API, and compares equal to these.
+TT_END_OF_STREAM = int(TokenType.EndOfStream)
+TT_NEWLINE       = int(TokenType.Newline)
+TT_INDENT        = int(TokenType.Indent)
+TT_DEDENT        = int(TokenType.Dedent)
+TT_COMMENT       = int(TokenType.Comment)
+TT_IDENTIFIER    = int(TokenType.Identifier)
+TT_NUMBER        = int(TokenType.Number)
+TT_STRING        = int(TokenType.String)
+TT_SYMBOL        = int(TokenType.Symbol)
+
+
 class Token:
+	__slots__ = "type", "value", "span"
+
 	def __init__(self, type, value, span=None):
 		self.type = type
 		self.value = value
@@ -36,9 +96,9 @@ class Token:
 	def __str__(self):
 		if self.span is not None:
 			begin, end = self.span
-			return "<%s: %s, %r (%d:%d, %d:%d)>" % (self.__class__.__name__, self.type.name, self.value, *begin, *end)
+			return "<%s: %s, %r (%d:%d, %d:%d)>" % (self.__class__.__name__, TokenType(self.type).name, self.value, *begin, *end)
 		else:
-			return "<%s: %s, %r>" % (self.__class__.__name__, self.type.name, self.value)
+			return "<%s: %s, %r>" % (self.__class__.__name__, TokenType(self.type).name, self.value)
 
 	def __repr__(self):
 		if self.span is not None:
@@ -47,6 +107,59 @@ class Token:
 			return "%s(%r, %r)" % (self.__class__.__name__, self.type, self.value)
 
 
+class TokenBuffer:
+	"""Structure-of-arrays token stream.
+
+	Tokens are stored as parallel arrays of type ids, spans and indices
+	into an interned value list, instead of one Token object per token.
+	token() and iteration build compatibility Token views on demand.
+	"""
+
+	__slots__ = "types", "spans", "value_indices", "values", "_interned"
+
+	def __init__(self):
+		self.types = array("B")
+		self.spans = array("i") # 4 entries per token: begin line, begin character, end line, end character
+		self.value_indices = array("i")
+		self.values = []
+		self._interned = {}
+
+	def append(self, type, value, span):
+		try:
+			index = self._interned[value]
+		except KeyError:
+			index = len(self.values)
+			self._interned[value] = index
+			self.values.append(value)
+
+		begin, end = span
+
+		self.types.append(type)
+		self.spans.extend((*begin, *end))
+		self.value_indices.append(index)
+
+	def type(self, index):
+		return self.types[index]
+
+	def value(self, index):
+		return self.values[self.value_indices[index]]
+
+	def span(self, index):
+		spans = self.spans
+		index *= 4
+		return (spans[index], spans[index + 1]), (spans[index + 2], spans[index + 3])
+
+	def token(self, index):
+		return Token(self.types[index], self.value(index), self.span(index))
+
+	def __len__(self):
+		return len(self.types)
+
+	def __iter__(self):
+		for index in range(len(self.types)):
+			yield self.token(index)
+
+
 class LexerError(Exception):
 	pass
 
@@ -123,22 +236,69 @@ class Lexer:
 
 		return c
 
+	def _skip_run(self, pattern):
+		# The patterns never match newlines, so only the character counter moves
+		end = pattern.match(self.string, self.ptr).end()
+		self.character += end - self.ptr
+		self.ptr = end
+
+	def _scan_blank_line(self):
+		# Decides whether the current line is blank with two bulk scans,
+		# instead of stepping and backtracking character by character
+		end = _horizontal_whitespace_pattern.match(self.string, self.ptr).end()
+
+		if end >= self.length:
+			# Only whitespace remains; consume it and finish at the end of the stream
+			self.character += end - self.ptr
+			self.ptr = end
+			return self._scan()
+
+		begin = end
+		c = self.string[end]
+
+		if c == "\n":
+			end += 1
+		elif c == "\r" and self.string[end + 1:end + 2] == "\n":
+			end += 2
+		else:
+			# Not a blank line; nothing has been consumed
+			return None
+
+		span_begin = self.line, self.character + (begin - self.ptr)
+		self.ptr = end
+		self.line += 1
+		self.character = 1
+		span_end = self.line, self.character
+
+		return TT_NEWLINE, self.string[begin:end], (span_begin, span_end)
+
 	def _peek(self, offset=0):
-		with self.peeking():
+		# _next only moves the position, so a tuple checkpoint is enough
+		saved = self.ptr, self.line, self.character
+		try:
 			for _ in range(offset):
 				self._next()
 			return self._next()
+		finally:
+			self.ptr, self.line, self.character = saved
 
 	def next(self):
+		return Token(*self._scan())
+
+	def _scan(self):
+		# The scan works in plain (type, value, span) tuples; next() wraps
+		# them in Token objects, tokenize() appends them to the buffer as is
+		s, length = self.string, self.length
+
 		if self.dedents > 0:
 			span_end = self.line, self.character
 
 			self.indents.pop()
 			self.dedents -= 1
 
-			return Token(TokenType.Dedent, self.indents[-1], (span_end, span_end))
+			return TT_DEDENT, self.indents[-1], (span_end, span_end)
 
-		if self.ptr >= self.length:
+		if self.ptr >= length:
 			span_end = self.line, self.character
 
 			if len(self.brackets) > 0:
@@ -146,61 +306,40 @@ class Lexer:
 
 			if len(self.indents) > 1:
 				self.indents.pop()
-				return Token(TokenType.Dedent, self.indents[-1], (span_end, span_end))
+				return TT_DEDENT, self.indents[-1], (span_end, span_end)
 
-			return Token(TokenType.EndOfStream, "", (span_end, span_end))
+			return TT_END_OF_STREAM, "", (span_end, span_end)
 
-		c = self.string[self.ptr]
+		c = s[self.ptr]
 
 		if self.character == 1 and len(self.brackets) == 0:
-			with self.peeking() as p:
-				empty_line = False
-
-				while self.ptr < self.length:
-					span_begin = self.line, self.character
-					begin = self.ptr
-					c2 = self._next()
-					if not c2.isspace():
-						break
-					elif c2 == "\n":
-						empty_line = True
-						break
-					elif c2 == "\r" and self._next() == "\n":
-						empty_line = True
-						break
-				else:
-					p.save()
-					return self.next()
-
-				if empty_line:
-					p.save()
-					span_end = self.line, self.character
-					return Token(TokenType.Newline, self.string[begin:self.ptr], (span_begin, span_end))
+			token = self._scan_blank_line()
+			if token is not None:
+				return token
 
-			if c not in _horizontal_whitespace:
+			if ord(c) >= 256 or _class_table[ord(c)] != _CLS_HORIZONTAL_WHITESPACE:
 				if len(self.indents) > 1:
 					self.indents.pop()
 					span_end = self.line, self.character
-					return Token(TokenType.Dedent, self.indents[-1], (span_end, span_end))
+					return TT_DEDENT, self.indents[-1], (span_end, span_end)
 			else:
 				span_begin = self.line, self.character
 				begin = self.ptr
-				while self.ptr < self.length:
-					if self.string[self.ptr] not in _horizontal_whitespace:
-						break
-					self._next()
+				self._skip_run(_horizontal_whitespace_pattern)
 				span_end = self.line, self.character
 
-				if self.string[self.ptr] != "#":
+				if s[self.ptr] != "#":
 					old_indent = self.indents[-1]
-					new_indent = self.string[begin:self.ptr]
+					new_indent = s[begin:self.ptr]
 
-					for old, new in zip_longest(old_indent, new_indent):
-						if old is None:
+					# Valid indentation is a prefix relationship, so a pair of
+					# startswith checks replaces comparing character by character
+					if new_indent != old_indent:
+						if new_indent.startswith(old_indent):
 							self.indents.append(new_indent)
-							return Token(TokenType.Indent, new_indent, (span_begin, span_end))
+							return TT_INDENT, new_indent, (span_begin, span_end)
 
-						if new is None:
+						if old_indent.startswith(new_indent):
 							for i in range(len(self.indents) - 1, 0, -1):
 								if self.indents[i] == new_indent:
 									break
@@ -211,97 +350,93 @@ class Lexer:
 							self.indents.pop()
 							self.dedents -= 1
 
-							return Token(TokenType.Dedent, self.indents[-1], (span_end, span_end))
+							return TT_DEDENT, self.indents[-1], (span_end, span_end)
 
-						if old != new:
-							self._fail("Inconsistent use of tabs and spaces in indentation", (span_begin, span_end))
+						self._fail("Inconsistent use of tabs and spaces in indentation", (span_begin, span_end))
 
-		while self.ptr < self.length:
-			if self.string[self.ptr] not in _horizontal_whitespace:
-				break
-			self._next()
+		self._skip_run(_horizontal_whitespace_pattern)
 
-		c = self.string[self.ptr]
+		c = s[self.ptr]
+		cls = _class_table[ord(c)] if ord(c) < 256 else _CLS_OTHER
 
-		if c == "#":
+		if cls == _CLS_IDENTIFIER:
 			span_begin = self.line, self.character
 			begin = self.ptr
-			while self.ptr < self.length:
-				if self.string[self.ptr] in "\r\n":
-					break
-				self._next()
+			self._skip_run(_identifier_pattern)
 			span_end = self.line, self.character
-			return Token(TokenType.Comment, self.string[begin:self.ptr], (span_begin, span_end))
+			return TT_IDENTIFIER, s[begin:self.ptr], (span_begin, span_end)
 
-		if c.isdigit():
-			span_begin = self.line, self.character
-			begin = self.ptr
+		# Ordered by measured frequency: identifiers and symbols dominate,
+		# comments and strings are rare
+		if cls != _CLS_OTHER:
+			if cls == _CLS_DIGIT:
+				span_begin = self.line, self.character
+				begin = self.ptr
 
-			while self.ptr < self.length:
-				if not self.string[self.ptr].isdigit():
-					break
-				self._next()
+				self._skip_run(_digits_pattern)
 
-			if self.ptr < self.length and self.string[self.ptr] == ".":
-				self._next()
-				while self.ptr < self.length:
-					if not self.string[self.ptr].isdigit():
-						break
-					self._next()
-
-			if self.ptr < self.length:
-				if self.string[self.ptr] == "%":
-					self._next()
+				if self.ptr < length and s[self.ptr] == ".":
+					self.ptr += 1
+					self.character += 1
+					self._skip_run(_digits_pattern)
+
+				if self.ptr < length:
+					if s[self.ptr] == "%":
+						self.ptr += 1
+						self.character += 1
+					else:
+						self._skip_run(_identifier_pattern)
+
+				span_end = self.line, self.character
+
+				return TT_NUMBER, s[begin:self.ptr], (span_begin, span_end)
+				# return TT_INTEGER, s[begin:self.ptr], (span_begin, span_end)
+
+			if cls == _CLS_NEWLINE:
+				span_begin = self.line, self.character
+				begin = self.ptr
+				if c == "\r":
+					if self.ptr + 1 >= length:
+						raise LexerUnexpectedEndError("Unexpected end of stream")
+					assert s[self.ptr + 1] == "\n"
+					self.ptr += 2
 				else:
-					while self.ptr < self.length:
-						if self.string[self.ptr] not in _identifier:
-							break
-						self._next()
+					self.ptr += 1
+				self.line += 1
+				self.character = 1
+				span_end = self.line, self.character
+				return TT_NEWLINE, s[begin:self.ptr], (span_begin, span_end)
 
-			span_end = self.line, self.character
+			if cls == _CLS_QUOTE:
+				span_begin = self.line, self.character
+				begin = self.ptr
 
-			return Token(TokenType.Number, self.string[begin:self.ptr], (span_begin, span_end))
-			# return Token(TokenType.Integer, self.string[begin:self.ptr], (span_begin, span_end))
+				match = _string_patterns[c].match(s, self.ptr)
+				if match is None:
+					if s.find("\n", self.ptr) == -1:
+						raise LexerUnexpectedEndError("Unexpected end of stream")
+					self._fail("Unexpected end of line while scanning string literal", (span_begin, (self.line + 1, 1)))
 
-		if c in _identifier_start:
-			span_begin = self.line, self.character
-			begin = self.ptr
-			while self.ptr < self.length:
-				if self.string[self.ptr] not in _identifier:
-					break
-				self._next()
-			span_end = self.line, self.character
-			return Token(TokenType.Identifier, self.string[begin:self.ptr], (span_begin, span_end))
+				end = match.end()
+				self.character += end - self.ptr
+				self.ptr = end
 
-		if c in "\"'":
-			span_begin = self.line, self.character
-			begin = self.ptr
-			quote = self._next()
-			while True:
-				c = self._next()
-				if c == "\\":
-					self._next()
-					continue
-				if c == quote:
-					break
-				if c == "\n":
-					self._fail("Unexpected end of line while scanning string literal", (span_begin, (self.line, self.character)))
-			span_end = self.line, self.character
-			# return Token(TokenType.String, self.string[begin:self.ptr], (span_begin, span_end))
-			return Token(TokenType.String, literal_eval(self.string[begin:self.ptr]), (span_begin, span_end))
+				span_end = self.line, self.character
+				# return TT_STRING, s[begin:end], (span_begin, span_end)
+				return TT_STRING, literal_eval(s[begin:end]), (span_begin, span_end)
 
-		if self.string[self.ptr] in "\r\n":
-			span_begin = self.line, self.character
-			begin = self.ptr
-			if self._next() == "\r":
-				assert self._next() == "\n"
-			span_end = self.line, self.character
-			return Token(TokenType.Newline, self.string[begin:self.ptr], (span_begin, span_end))
+			if cls == _CLS_COMMENT:
+				span_begin = self.line, self.character
+				begin = self.ptr
+				self._skip_run(_comment_pattern)
+				span_end = self.line, self.character
+				return TT_COMMENT, s[begin:self.ptr], (span_begin, span_end)
 
 		assert not c.isspace()
 
 		span_begin = self.line, self.character
-		c = self._next()
+		self.ptr += 1
+		self.character += 1
 		span_end = self.line, self.character
 
 		if c in "([{":
@@ -317,13 +452,23 @@ class Lexer:
 
 		if c == ":":
 			with suppress(LexerUnexpectedEndError):
-				with self.peeking() as p:
-					if self._peek() == "=":
-						symbol += self._next()
-						span_end = self.line, self.character
-						p.save()
+				if self._peek() == "=":
+					symbol += self._next()
+					span_end = self.line, self.character
 
-		return Token(TokenType.Symbol, symbol, (span_begin, span_end))
+		return TT_SYMBOL, symbol, (span_begin, span_end)
+
+	def tokenize(self):
+		# Fills the buffer straight from the scan tuples,
+		# without materializing a Token object per token
+		buffer = TokenBuffer()
+		append = buffer.append
+		scan = self._scan
+		while True:
+			type, value, span = scan()
+			append(type, value, span)
+			if type == TT_END_OF_STREAM:
+				return buffer
 
 	def peek(self, offset=0):
 		with self.peeking():
@@ -345,5 +490,5 @@ class Lexer:
 		while True:
 			token = self.next()
 			yield token
-			if token.type == TokenType.EndOfStream:
+			if token.type == TT_END_OF_STREAM:
 				break
@@ -2,7 +2,10 @@
 # -*- coding: utf-8 -*-
 
 from .constantfolding import *
+from .expressioncompiling import *
 
 
 def optimize(scene):
-	return fold_constants(scene)
+	scene = fold_constants(scene)
+	scene = compile_expressions(scene)
+	return scene
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from ..datatypes import Number, NumberType, Expression, BinOp, UnaryOp
+
+
+class _NotCompilable(Exception):
+	pass
+
+
+class CompiledExpression(Expression):
+	def __init__(self, expression, func, parameters):
+		assert isinstance(expression, Expression)
+		self.expression = expression
+		self.parameters = parameters
+		self._compiled = func
+		self._dependencies, self._versions, self._cache = (), None, None
+
+	@property
+	def type(self):
+		return self.expression.type
+
+	def _eval(self):
+		return Number(self._compiled(*(parameter.eval().value for parameter in self.parameters)))
+
+	def fold(self):
+		if self.is_constant():
+			return self.eval()
+		return self
+
+	def is_constant(self):
+		return self.expression.is_constant()
+
+	def apply(self, relative):
+		self.expression.apply(relative)
+
+	def iter_values(self):
+		yield self.expression
+
+	def __repr__(self):
+		return f"{self.__class__.__name__}({self.expression!r})"
+
+
+def compile_expression(expression):
+	if not isinstance(expression, (BinOp, UnaryOp)):
+		return None
+
+	parameters = []
+	indices = {}
+
+	def emit(value):
+		if isinstance(value, BinOp) and value.type is NumberType:
+			if value.op not in ("+", "-", "*", "/", "//", "%"):
+				raise _NotCompilable
+			return "(%s %s %s)" % (emit(value.lhs), value.op, emit(value.rhs))
+		if isinstance(value, UnaryOp) and value.type is NumberType:
+			return "(%s%s)" % (value.op, emit(value.operand))
+		if type(value) is Number:
+			return repr(value.value)
+		if value.type is not NumberType:
+			raise _NotCompilable
+		try:
+			index = indices[id(value)]
+		except KeyError:
+			index = len(parameters)
+			indices[id(value)] = index
+			parameters.append(value)
+		return "p%d" % index
+
+	try:
+		source = emit(expression)
+	except _NotCompilable:
+		return None
+
+	if not parameters:
+		# Fully constant; left to fold_constants
+		return None
+
+	args = ", ".join("p%d" % index for index in range(len(parameters)))
+	func = eval("lambda %s: %s" % (args, source))
+
+	return CompiledExpression(expression, func, tuple(parameters))
+
+
+def compile_expressions(scene):
+	for element in scene.traverse():
+		for property in element.properties.values():
+			if property.readonly:
+				continue
+			compiled = compile_expression(property.get())
+			if compiled is not None:
+				property.set(compiled)
+	return scene
@@ -206,19 +206,29 @@ class ParserError(Exception):
 
 class Parser:
 	def __init__(self):
-		self._lexer = None
+		self._buffer = None
+		self._index = 0
 
 	def _next(self):
-		for token in self._lexer:
-			if token.type == TokenType.Comment:
-				continue
-			return token
+		buffer = self._buffer
+		index = self._index
+		while buffer.type(index) == TokenType.Comment:
+			index += 1
+		# The buffer ends with EndOfStream; stay on it once reached
+		if index + 1 < len(buffer):
+			self._index = index + 1
+		else:
+			self._index = index
+		return buffer.token(index)
 
 	def _peek(self, offset=0):
-		with self._lexer.peeking():
+		saved = self._index
+		try:
 			for _ in range(offset):
 				self._next()
 			return self._next()
+		finally:
+			self._index = saved
 
 	def _peek_if(self, type, value=None, offset=0):
 		token = self._peek(offset)
@@ -241,11 +251,12 @@ class Parser:
 		return result
 
 	def _skip(self, *types):
-		with self._lexer.peeking() as p:
-			for token in self._lexer:
-				if token.type not in types:
-					break
-				p.save()
+		buffer = self._buffer
+		index = self._index
+		last = len(buffer) - 1
+		while index < last and buffer.type(index) in types:
+			index += 1
+		self._index = index
 
 	def _skip_newlines(self):
 		self._skip(TokenType.Newline, TokenType.Comment)
@@ -306,14 +317,15 @@ class Parser:
 		self._expect_token(TokenType.Dedent)
 
 	def parse(self, string):
-		self._lexer = Lexer(string)
+		self._buffer = Lexer(string).tokenize()
+		self._index = 0
 
 		scene = self._parse_scene()
 
 		self._skip_newlines()
 		self._expect_token(TokenType.EndOfStream)
 
-		self._lexer = None
+		self._buffer = None
 
 		return scene
 
@@ -1,15 +1,17 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager, redirect_stdout
 from operator import itemgetter
 from math import ceil
 from io import StringIO
+import multiprocessing
 import sys
 
 from .datatypes import Point
 from .rasterizer import Image, load_image, load_font, to_color
-from .elements import Element, Scene, ImageFit, TextAnchor, TextAlignment
+from .elements import Element, Scene, Animation, Image as ImageElement, Text, ImageFit, TextAnchor, TextAlignment
 from .utilities import iter_all_superclasses
 
 
@@ -21,16 +23,21 @@ def calc_frame_count(duration, frame_rate, *, inclusive=False):
 	return frames
 
 
+def frame_times(duration, frame_rate, *, inclusive=False):
+	frames = calc_frame_count(duration, frame_rate, inclusive=inclusive)
+	return range(frames), [frame / frame_rate for frame in range(frames)]
+
+
 def iter_frame_time(duration, frame_rate, *, inclusive=False):
-	for frame in range(calc_frame_count(duration, frame_rate, inclusive=inclusive)):
-		time = frame / frame_rate
-		yield frame, time
+	return zip(*frame_times(duration, frame_rate, inclusive=inclusive))
 
 
 class Renderer:
 	def __init__(self):
 		self._image = None
 		self._translations = [Point(0, 0)]
+		self._dispatch = {}
+		self._time = None
 
 	@property
 	def translation(self):
@@ -42,9 +49,10 @@ class Renderer:
 		yield self
 		self._translations.pop()
 
-	def render(self, element):
+	def render(self, element, time=None):
 		assert isinstance(element, Element)
 		assert isinstance(element, Scene)
+		self._time = time
 		image = self._render(element)
 		assert isinstance(image, Image)
 		return image
@@ -52,34 +60,58 @@ class Renderer:
 	def _render(self, element):
 		assert isinstance(element, Element)
 
+		if self._time is not None:
+			# Fused compute-and-draw traversal: computing each element right
+			# before it is drawn saves a second walk over the tree
+			element.compute_properties(self._time)
+			for animation in element.animations:
+				animation.compute(self._time)
+
+		try:
+			visitor = self._dispatch[type(element)]
+		except KeyError:
+			visitor = self._find_visitor(type(element))
+			self._dispatch[type(element)] = visitor
+
+		return visitor(element)
+
+	def _find_visitor(self, cls):
 		try:
-			method = f"_render_{element.__class__.__name__}"
-			visitor = getattr(self, method)
+			return getattr(self, f"_render_{cls.__name__}")
 		except AttributeError:
-			for cls in filter(lambda cls: issubclass(cls, Element), iter_all_superclasses(element.__class__)):
+			for base in filter(lambda base: issubclass(base, Element), iter_all_superclasses(cls)):
 				try:
-					method = f"_render_{cls.__name__}"
-					visitor = getattr(self, method)
-					break
+					return getattr(self, f"_render_{base.__name__}")
 				except AttributeError:
 					pass
-			else:
-				raise
+			raise
 
-		return visitor(element)
+	def _render_Scene(self, scene):
+		size = max(int(scene.p_width), 0), max(int(scene.p_height), 0)
+		background = to_color(scene.p_background)
+
+		# Reusing the destination image and clearing it in place avoids
+		# allocating a fresh raster for every frame of an animation
+		if self._image is None or self._image.size() != size:
+			self._image = Image(*size, background)
+		else:
+			self._image.clear(background)
 
-	def _render_children(self, element):
-		for child in element.elements:
-			self._render(child)
+		# Inlined child loops; most elements are leaves, so checking for
+		# children first skips the loop setup entirely
+		children = scene.elements
+		if children:
+			for child in children:
+				self._render(child)
 
-	def _render_Scene(self, scene):
-		self._image = Image(max(int(scene.p_width), 0), max(int(scene.p_height), 0), to_color(scene.p_background))
-		self._render_children(scene)
 		return self._image
 
 	def _render_Drawable(self, drawable):
-		with self.translate(Point(drawable.p_x, drawable.p_y)):
-			self._render_children(drawable)
+		children = drawable.elements
+		if children:
+			with self.translate(Point(drawable.p_x, drawable.p_y)):
+				for child in children:
+					self._render(child)
 
 	# def _render_Group(self, group):
 	# 	with self.translate(group.position):
@@ -95,8 +127,11 @@ class Renderer:
 
 		# TODO: rect.p_outline, rect.p_outline_width
 
-		with self.translate(Point(lx, ly)):
-			self._render_children(rect)
+		children = rect.elements
+		if children:
+			with self.translate(Point(lx, ly)):
+				for child in children:
+					self._render(child)
 
 	def _render_Line(self, line):
 		tx, ty = self.translation
@@ -108,7 +143,10 @@ class Renderer:
 		# TODO: line.p_width
 
 		# TODO: Translate to p1, p2, min(p1, p2) or at all?
-		self._render_children(line)
+		children = line.elements
+		if children:
+			for child in children:
+				self._render(child)
 
 	def _render_Circle(self, circle):
 		tx, ty = self.translation
@@ -121,7 +159,10 @@ class Renderer:
 		# TODO: circle.p_outline, circle.p_outline_width
 
 		# TODO: Translate to min or center?
-		self._render_children(circle)
+		children = circle.elements
+		if children:
+			for child in children:
+				self._render(child)
 
 	def _render_Ellipse(self, ellipse):
 		tx, ty = self.translation
@@ -135,7 +176,10 @@ class Renderer:
 		# TODO: ellipse.p_outline, ellipse.p_outline_width
 
 		# TODO: Translate to min or center?
-		self._render_children(ellipse)
+		children = ellipse.elements
+		if children:
+			for child in children:
+				self._render(child)
 
 	def _render_Arc(self, arc):
 		raise NotImplementedError
@@ -184,8 +228,11 @@ class Renderer:
 
 		self._image.draw_image((x, y, w, h), _image)
 
-		with self.translate(Point(lx, ly)):
-			self._render_children(image)
+		children = image.elements
+		if children:
+			with self.translate(Point(lx, ly)):
+				for child in children:
+					self._render(child)
 
 	def _render_Text(self, text):
 		font = load_font(text.p_font)
@@ -246,20 +293,118 @@ class Renderer:
 			self._image.draw_text((x, y), _text, font, font_size, fill)
 
 		# TODO: Translate?
-		self._render_children(text)
+		children = text.elements
+		if children:
+			for child in children:
+				self._render(child)
+
 
+def _preload_assets(scene):
+	"""Loads every referenced image and font into the module caches.
 
-def _render(renderer, scene, time):
-	scene.compute(time)
-	return renderer.render(scene)
+	load_image and load_font already memoize, but forked workers only share
+	cache entries created before the fork; preloading avoids every worker
+	parsing the same assets again.
+	"""
+	for element in scene.traverse():
+		if isinstance(element, ImageElement):
+			load_image(element.p_filename)
+		elif isinstance(element, Text):
+			load_font(element.p_font)
+
+
+def precompute_animated_properties(scene, times):
+	"""Evaluates every animation-driven property for all frame times up front.
+
+	Only animated properties vary between frames, so the frame loop can
+	apply the precomputed values directly instead of recomputing the whole
+	element tree once per frame.
+	"""
+	animations = [element for element in scene.traverse() if isinstance(element, Animation)]
+
+	animated = []
+	for animation in animations:
+		for name in animation.element_properties:
+			if (animation.element, name) not in animated:
+				animated.append((animation.element, name))
+
+	base = [element.get(name).eval() for element, name in animated]
+
+	values = [[None] * len(times) for _ in animated]
+
+	for frame, time in enumerate(times):
+		for (element, name), value in zip(animated, base):
+			element.set_computed(name, value)
+
+		for animation in animations:
+			animation.compute(time)
+
+		for i, (element, name) in enumerate(animated):
+			values[i][frame] = element.get_computed(name).get()
+
+	return animated, values
 
 
 def render(scene, time=0):
-	return _render(Renderer(), scene, time)
+	return Renderer().render(scene, time)
+
+
+_worker_state = None
+
+
+def _render_frame(frame):
+	# Runs in a forked worker; the state is inherited from the parent
+	scene, renderer, animated, values = _worker_state
+
+	for (element, name), frame_values in zip(animated, values):
+		element.set_computed(name, frame_values[frame])
+
+	# Image is a native type without pickle support, so the raw pixels
+	# cross the process boundary and the parent rebuilds the frame
+	image = renderer.render(scene)
+	return image.size(), image.to_bytes()
+
+
+def _render_animation_parallel(scene, workers, *, inclusive=True):
+	global _worker_state
+
+	duration = scene.p_duration.seconds
+	frame_rate = scene.p_frame_rate
+
+	frame_count = calc_frame_count(duration, frame_rate, inclusive=inclusive)
+
+	_, times = frame_times(duration, frame_rate, inclusive=inclusive)
+
+	scene.compute(times[0] if times else 0)
+
+	animated, values = precompute_animated_properties(scene, times)
+
+	_preload_assets(scene)
+
+	# Forked workers inherit the prepared scene, so only the frame index is
+	# sent to a worker and only the rendered image is sent back
+	_worker_state = scene, Renderer(), animated, values
+
+	frames = []
+	try:
+		with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork")) as executor:
+			for frame, ((width, height), data) in enumerate(executor.map(_render_frame, range(frame_count), chunksize=8)):
+				sys.stdout.write(f"\rRendering Frame {frame+1:04d}/{frame_count:04d} ({(frame+1)/frame_count*100:.0f}%)")
+				sys.stdout.flush()
+				frames.append(Image.from_bytes(width, height, data))
+	finally:
+		_worker_state = None
+
+	sys.stdout.write("\n")
+
+	return frames
 
 
 # TODO: Consider removing "inclusive" and instead use "scene.p_inclusive"
-def render_animation(scene, *, inclusive=True):
+def render_animation(scene, *, inclusive=True, workers=None):
+	if workers is not None and workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+		return _render_animation_parallel(scene, workers, inclusive=inclusive)
+
 	renderer = Renderer()
 
 	duration = scene.p_duration.seconds
@@ -267,6 +412,13 @@ def render_animation(scene, *, inclusive=True):
 
 	frame_count = calc_frame_count(duration, frame_rate, inclusive=inclusive)
 
+	_, times = frame_times(duration, frame_rate, inclusive=inclusive)
+
+	# Compute the static properties once; the frame loop only touches animated ones
+	scene.compute(times[0] if times else 0)
+
+	animated, values = precompute_animated_properties(scene, times)
+
 	add_newline = False
 
 	frames = []
@@ -279,7 +431,9 @@ def render_animation(scene, *, inclusive=True):
 		f = StringIO()
 		try:
 			with redirect_stdout(f):
-				frames.append(_render(renderer, scene, time))
+				for (element, name), frame_values in zip(animated, values):
+					element.set_computed(name, frame_values[frame])
+				frames.append(renderer.render(scene).copy())
 		finally:
 			output = f.getvalue()
 			if output: